@@ -20,20 +20,45 @@ This is safe for CI usage: files are updated via an atomic replace and a backup
 from __future__ import annotations
 
 import argparse
+import fnmatch
+import functools
+import hashlib
+import json
 import logging
+import mmap
 import os
 import re
 import shutil
 import time
 import stat
+import sys
 import tempfile
+import threading
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from pathlib import Path
-from typing import List, Optional, Tuple
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
 
 LOG = logging.getLogger(__name__)
 logging.basicConfig(level=logging.INFO)
 
+# Tokenizer for inline array bodies; compiled once at import instead of going
+# through the re module cache on every call. It never matches an empty or
+# whitespace-only token, so its findall() result needs no stripping or filtering.
+_TOKEN_RE = re.compile(r'"[^"]*"|\'[^\']*\'|\S+')
+
+# dnf install commands with FEDORA_PACKAGES context, e.g.
+# `dnf -y install ... "${FEDORA_PACKAGES[@]}"`: anywhere in a line (for
+# find_dnf_install_commands and the whole-file probe in _probe_dnf_file) and,
+# over a whole file, as full lines split into indent / `dnf ... install` / rest
+# (for add_exclusions_to_dnf_install). Both use [^\S\n] so no part of a match
+# can run onto the next line when searched over a whole file.
+_DNF_INSTALL_RE = re.compile(r'dnf[^\S\n]+(?:-y[^\S\n]+)?install.*FEDORA_PACKAGES')
+_DNF_INSTALL_LINE_RE = re.compile(
+    r'^([^\S\n]*)(dnf[^\S\n]+(?:-y[^\S\n]+)?install)(.*FEDORA_PACKAGES.*)$', re.M
+)
+
 
 @dataclass
 class ArrayEditResult:
@@ -96,6 +121,12 @@ class BuildCustomizer:
         ]
     }
 
+    # Freeze the entry lists into tuples of interned strings once at class load:
+    # callers can pass them around without copying, and set/dict lookups on
+    # them reuse the cached string hashes.
+    ADDITION_LIST = {name: tuple(map(sys.intern, entries)) for name, entries in ADDITION_LIST.items()}
+    REMOVAL_LIST = {name: tuple(map(sys.intern, entries)) for name, entries in REMOVAL_LIST.items()}
+
     # Line-level modifications: add or delete specific lines in files.
     # Keys are file paths relative to repo root.
     #   "add_after": { "anchor line": ["line to insert", ...], ... }
@@ -185,9 +216,291 @@ class BuildCustomizer:
 
     ARRAY_START_RE = re.compile(r"^\s*([A-Za-z0-9_]+)\s*=\s*\(")
 
+    # Closing paren of a multi-line array: first line starting with `)`
+    # (leading blanks allowed, but the match never spans lines).
+    _BLOCK_CLOSE_RE = re.compile(r"^[^\S\n]*\)", re.M)
+
+    # Upper bound on worker threads for the per-file scan/edit pools.
+    MAX_WORKERS = 32
+
+    # On-disk file cache (see load_file_cache/save_file_cache). Bump the schema
+    # version whenever the layout of a _file_cache or _clean_cache entry
+    # changes; a persisted cache with a different version is discarded wholesale.
+    DEFAULT_CACHE_FILE = ".customize-build.cache"
+    CACHE_SCHEMA_VERSION = 2
+
+    # Files at least this large are probed via mmap rather than read(); below
+    # it the mmap/munmap syscalls cost more than reading the file outright.
+    MMAP_MIN_SIZE = 8 * 1024
+
+    # Scans skip files larger than this (bytes) and files too small to contain
+    # even the shortest `NAME=()` of DEFAULT_ARRAY_NAMES (see _scan_probes).
+    MAX_SCAN_SIZE = 4_000_000
+
+    # Literals every _DNF_INSTALL_RE match contains; a file must hold all of them.
+    _DNF_NEEDLES = (b"dnf", b"FEDORA_PACKAGES")
+
+
+    @staticmethod
+    @functools.cache
+    def _combined_array_re(names: Tuple[str, ...]) -> re.Pattern:
+        """One alternation over `names` so a file is scanned once, not once per
+        array name. Keyed by the names themselves, so a subclass or instance
+        that overrides DEFAULT_ARRAY_NAMES gets a pattern for its own names."""
+        if not names:
+            return re.compile(r"(?!)")
+        return re.compile(r"^\s*(" + "|".join(re.escape(n) for n in names) + r")\s*=\s*\(", re.M)
+
+    @staticmethod
+    @functools.cache
+    def _scan_probes(names: Tuple[str, ...]) -> Tuple[int, Tuple[bytes, ...], re.Pattern]:
+        """Return (min_size, needles, bytes_re) used to reject files for `names`.
+
+        - min_size: size of the shortest possible `NAME=()` declaration
+        - needles: the raw-bytes names, probed before anything is decoded
+        - bytes_re: the _combined_array_re alternation over raw bytes (or an
+          mmap), confirming a real declaration; its whitespace class is
+          ASCII-only, which is all bash accepts as blanks anyway
+        Cached per name tuple, like _combined_array_re.
+        """
+        needles = tuple(n.encode() for n in names)
+        if not needles:
+            return 0, needles, re.compile(rb"(?!)")
+        bytes_re = re.compile(
+            rb"^\s*(" + b"|".join(re.escape(n) for n in needles) + rb")\s*=\s*\(", re.M
+        )
+        return min(map(len, needles)) + len("=()"), needles, bytes_re
+
+    @staticmethod
+    def _find_array_decl(text: str, array_name: str) -> Optional[int]:
+        """Return the offset just past the first `array_name=(` declaration.
+
+        Matches what the per-name `NAME=(` regex used to, but locates
+        candidates with str.find on the literal name and validates each hit
+        by hand: only whitespace before it on its line, then optional
+        whitespace, `=`, optional whitespace and `(`.
+        """
+        n = len(text)
+        hit = text.find(array_name)
+        while hit != -1:
+            line_start = text.rfind("\n", 0, hit) + 1
+            if line_start == hit or text[line_start:hit].isspace():
+                j = hit + len(array_name)
+                while j < n and text[j].isspace():
+                    j += 1
+                if j < n and text[j] == "=":
+                    j += 1
+                    while j < n and text[j].isspace():
+                        j += 1
+                    if j < n and text[j] == "(":
+                        return j + 1
+            hit = text.find(array_name, hit + 1)
+        return None
+
     def __init__(self, repo_root: Optional[str] = None, backup_dir: Optional[str] = None):
-        self.repo_root = Path(repo_root or os.getcwd()).resolve()
-        self.backup_dir = Path(backup_dir).resolve() if backup_dir else None
+        # Resolved lazily (see the properties below): resolve() walks every path
+        # component, which adds up when instances are created repeatedly.
+        self._repo_root_raw = repo_root or os.getcwd()
+        self._backup_dir_raw = backup_dir
+        # Path -> (st_mtime_ns, st_size, text, parsed), where `parsed` maps an
+        # array name to the offset just past its `NAME=(` (None when absent).
+        # `text` is None for files rejected by the bytes probe in _read_cached.
+        self._file_cache: dict = {}
+        # Files a pass ("defaults" / "dnf") found nothing to change in:
+        # Path -> (st_mtime_ns, st_size, payload). A re-run over an unchanged
+        # file costs one stat(); see _clean_entry/_mark_clean.
+        self._clean_cache: Dict[str, dict] = {"defaults": {}, "dnf": {}}
+        # _mark_clean is called from the apply_* worker threads.
+        self._clean_lock = threading.Lock()
+
+    @functools.cached_property
+    def repo_root(self) -> Path:
+        return Path(self._repo_root_raw).resolve()
+
+    @functools.cached_property
+    def backup_dir(self) -> Optional[Path]:
+        return Path(self._backup_dir_raw).resolve() if self._backup_dir_raw else None
+
+    @property
+    def _defaults_fingerprint(self) -> str:
+        """Digest of ADDITION_LIST/REMOVAL_LIST and DEFAULT_ARRAY_NAMES.
+
+        A persisted cache is only trusted when these are the same as when it
+        was saved: `parsed` offsets and probe misses only cover the array
+        names scanned for then, and clean "defaults" entries depend on the
+        entries. Not cached, so overrides on an instance are picked up.
+        """
+        blob = json.dumps(
+            [self.ADDITION_LIST, self.REMOVAL_LIST, list(self.DEFAULT_ARRAY_NAMES)], sort_keys=True
+        )
+        return hashlib.sha256(blob.encode()).hexdigest()
+
+    def _clean_entry(self, kind: str, path: Path, st: os.stat_result) -> Optional[tuple]:
+        """Return the _clean_cache entry for `path` if it is unchanged since it was marked."""
+        entry = self._clean_cache[kind].get(path)
+        if entry and entry[0] == st.st_mtime_ns and entry[1] == st.st_size:
+            return entry
+        return None
+
+    def _mark_clean(self, kind: str, path: Path, st: os.stat_result, payload=None) -> None:
+        with self._clean_lock:
+            self._clean_cache[kind][path] = (st.st_mtime_ns, st.st_size, payload)
+
+    @staticmethod
+    def _decode_script(raw: bytes) -> str:
+        """Decode raw script bytes the way read_text(encoding="utf-8") does.
+
+        Strict UTF-8 plus universal-newline translation, so CRLF/CR scripts are
+        parsed and rewritten with LF line endings throughout.
+        """
+        text = raw.decode("utf-8")
+        if "\r" in text:
+            text = text.replace("\r\n", "\n").replace("\r", "\n")
+        return text
+
+    def _cache_text(self, path: Path, text: str, st: os.stat_result) -> Tuple[str, dict]:
+        parsed: dict = {}
+        for m in self._combined_array_re(tuple(self.DEFAULT_ARRAY_NAMES)).finditer(text):
+            parsed.setdefault(m.group(1), m.end())
+        self._file_cache[path] = (st.st_mtime_ns, st.st_size, text, parsed)
+        return text, parsed
+
+    def _read_cached(self, path: Path, need_text: bool = True) -> Tuple[Optional[str], dict]:
+        """Return (text, parsed) for `path`, re-reading only if mtime/size changed.
+
+        With `need_text=False` (scan-only callers) files outside the scan size
+        bounds are skipped, and a file whose raw bytes declare none of the
+        default arrays (a literal probe, then the bytes regex) is not decoded;
+        both are returned with text None and an empty `parsed`.
+        """
+        path = Path(path)
+        st = os.stat(path)
+        min_size, needles, bytes_re = self._scan_probes(tuple(self.DEFAULT_ARRAY_NAMES))
+        if not need_text and not (
+            stat.S_ISREG(st.st_mode) and min_size <= st.st_size <= self.MAX_SCAN_SIZE
+        ):
+            # Too small to hold any default array, or far too large to be a
+            # hand-edited build script (e.g. a generated file under the glob).
+            if st.st_size > self.MAX_SCAN_SIZE:
+                LOG.warning("Skipping %s: %d bytes exceeds MAX_SCAN_SIZE", path, st.st_size)
+            return None, {}
+        entry = self._file_cache.get(path)
+        if (entry and entry[0] == st.st_mtime_ns and entry[1] == st.st_size
+                and (entry[2] is not None or not need_text)):
+            return entry[2], entry[3]
+        raw = None
+        with open(path, "rb") as f:
+            if need_text:
+                hit = True
+            elif st.st_size >= self.MMAP_MIN_SIZE:
+                # Probe large files through a read-only mapping: a miss never
+                # copies the file into a Python bytes object.
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    hit = (any(mm.find(n) != -1 for n in needles)
+                           and bytes_re.search(mm) is not None)
+            else:
+                raw = f.read()
+                # names that only appear as "${NAME[@]}" uses are rejected here too
+                hit = (any(n in raw for n in needles)
+                       and bytes_re.search(raw) is not None)
+            if hit and raw is None:
+                raw = f.read()
+        if not hit:
+            self._file_cache[path] = (st.st_mtime_ns, st.st_size, None, {})
+            return None, {}
+        return self._cache_text(path, self._decode_script(raw), st)
+
+    def _find_array_start(self, text: str, parsed: dict, array_name: str) -> Optional[int]:
+        """Return the offset just past `array_name=(` in text, memoized in `parsed`."""
+        if array_name not in parsed:
+            parsed[array_name] = self._find_array_decl(text, array_name)
+        return parsed[array_name]
+
+    def load_file_cache(self, cache_path: Path) -> None:
+        """Load a cache written by save_file_cache; ignore missing/stale caches."""
+        try:
+            data = json.loads(Path(cache_path).read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return
+        if not isinstance(data, dict) or data.get("version") != self.CACHE_SCHEMA_VERSION:
+            LOG.info("Ignoring file cache %s (schema version mismatch)", cache_path)
+            return
+        if data.get("defaults_fingerprint") != self._defaults_fingerprint:
+            LOG.info("Ignoring file cache %s (ADDITION_LIST/REMOVAL_LIST changed)", cache_path)
+            return
+        # Build into locals first so a malformed cache leaves nothing half-loaded.
+        try:
+            file_cache = {}
+            for key, (mtime_ns, size, text, parsed) in data.get("entries", {}).items():
+                file_cache[Path(key)] = (mtime_ns, size, text, dict(parsed))
+            clean_cache = {kind: {} for kind in self._clean_cache}
+            for kind, entries in data.get("clean", {}).items():
+                if kind not in clean_cache:
+                    continue
+                for key, (mtime_ns, size, payload) in entries.items():
+                    clean_cache[kind][Path(key)] = (mtime_ns, size, payload)
+        except (TypeError, ValueError, AttributeError):
+            LOG.warning("Ignoring malformed file cache %s", cache_path)
+            return
+        self._file_cache.update(file_cache)
+        for kind, entries in clean_cache.items():
+            self._clean_cache[kind].update(entries)
+        LOG.info("Loaded %d cached files from %s", len(self._file_cache), cache_path)
+
+    def save_file_cache(self, cache_path: Path) -> None:
+        """Persist the file cache so unchanged files are not re-read next run."""
+        data = {
+            "version": self.CACHE_SCHEMA_VERSION,
+            "entries": {str(k): list(v) for k, v in self._file_cache.items()},
+            "defaults_fingerprint": self._defaults_fingerprint,
+            "clean": {
+                kind: {str(k): list(v) for k, v in entries.items()}
+                for kind, entries in self._clean_cache.items()
+            },
+        }
+        try:
+            self._write_atomic(Path(cache_path), json.dumps(data), backup=False)
+        except OSError:
+            LOG.exception("Failed to write file cache %s", cache_path)
+
+    def _iter_sh_files(self, patterns: List[str]) -> Iterator[str]:
+        """Yield paths (as str) of regular files under repo_root matching `patterns`.
+
+        Patterns of the form `prefix/**/name-glob` or `prefix/name-glob` are
+        walked with an explicit stack of os.scandir iterators, so the cached
+        DirEntry type replaces the per-file stat() of Path.glob + is_file().
+        Like Path.glob, directory symlinks are not descended into. Any other
+        pattern shape falls back to Path.glob.
+        """
+        for pattern in patterns:
+            parts = pattern.split("/")
+            i = 0
+            while i < len(parts) and not any(c in parts[i] for c in "*?["):
+                i += 1
+            rest = parts[i:]
+            if len(rest) == 1:
+                recursive = False
+            elif len(rest) == 2 and rest[0] == "**":
+                recursive = True
+            else:
+                for p in self.repo_root.glob(pattern):
+                    if p.is_file():
+                        yield str(p)
+                continue
+
+            name_re = re.compile(fnmatch.translate(rest[-1]))
+            stack = [os.path.join(str(self.repo_root), *parts[:i])]
+            while stack:
+                try:
+                    it = os.scandir(stack.pop())
+                except OSError:
+                    continue
+                with it:
+                    for entry in it:
+                        if recursive and entry.is_dir(follow_symlinks=False):
+                            stack.append(entry.path)
+                        elif name_re.match(entry.name) and entry.is_file():
+                            yield entry.path
 
     def find_files_with_array(self, array_name: Optional[str] = None, patterns: Optional[List[str]] = None) -> List[Path]:
         """Search repository for files containing a bash array definition.
@@ -199,23 +512,36 @@ class BuildCustomizer:
         patterns = patterns or self.DEFAULT_SEARCH_PATTERNS
         matches: List[Path] = []
 
-        for pattern in patterns:
-            for p in self.repo_root.glob(pattern):
-                if not p.is_file():
-                    continue
-                try:
-                    text = p.read_text(encoding="utf-8")
-                except Exception:
+        needle = array_name.encode() if array_name else None
+        for path in self._iter_sh_files(patterns):
+            try:
+                with open(path, "rb") as f:
+                    raw = f.read()
+                # cheap bytes probe: skip the decode and regex when the name
+                # does not occur at all (the regex still confirms real hits)
+                if needle is not None and needle not in raw:
                     continue
-                if array_name:
-                    if re.search(rf"^\s*{re.escape(array_name)}\s*=\s*\(", text, flags=re.M):
-                        matches.append(p)
-                else:
-                    if self.ARRAY_START_RE.search(text):
-                        matches.append(p)
+                text = self._decode_script(raw)
+            except Exception:
+                continue
+            if array_name:
+                if self._find_array_decl(text, array_name) is not None:
+                    matches.append(Path(path))
+            else:
+                if self.ARRAY_START_RE.search(text):
+                    matches.append(Path(path))
         LOG.info("Found %d files matching array=%s", len(matches), array_name)
         return matches
 
+    def _scan_file(self, path: str) -> Tuple[Path, List[str]]:
+        """Return (path, default array names declared in it); unreadable files have none."""
+        p = Path(path)
+        try:
+            _, parsed = self._read_cached(p, need_text=False)
+        except Exception:
+            return p, []
+        return p, [name for name in self.DEFAULT_ARRAY_NAMES if parsed.get(name) is not None]
+
     def find_files_for_default_arrays(self, patterns: Optional[List[str]] = None) -> dict:
         """Scan repository and return a mapping of default array name -> list[Path].
 
@@ -225,17 +551,14 @@ class BuildCustomizer:
         """
         patterns = patterns or self.DEFAULT_SEARCH_PATTERNS
         result = {name: [] for name in self.DEFAULT_ARRAY_NAMES}
-        for pattern in patterns:
-            for p in self.repo_root.glob(pattern):
-                if not p.is_file():
-                    continue
-                try:
-                    text = p.read_text(encoding="utf-8")
-                except Exception:
-                    continue
-                for name in self.DEFAULT_ARRAY_NAMES:
-                    if re.search(rf"^\s*{re.escape(name)}\s*=\s*\(", text, flags=re.M):
-                        result[name].append(p)
+        # Overlapping patterns can yield a file more than once; scan (and so
+        # later edit) each file once.
+        paths = list(dict.fromkeys(Path(p) for p in self._iter_sh_files(patterns)))
+        # Per-file scans are independent and I/O-bound; ex.map keeps file order.
+        with ThreadPoolExecutor(max_workers=min(self.MAX_WORKERS, len(paths) or 1)) as ex:
+            for p, names in ex.map(self._scan_file, paths):
+                for name in names:
+                    result[name].append(p)
         LOG.info("Scanned defaults, found arrays: %s", {k: len(v) for k, v in result.items()})
         return result
 
@@ -254,90 +577,173 @@ class BuildCustomizer:
             LOG.info(" - %s", f)
         return files
 
-    def _parse_array_block(self, lines: List[str], start_idx: int) -> Tuple[int, List[str], str]:
-        """Given file lines and index of array start (line with NAME=( ), return:
-        - end index (index of line containing closing ')')
+    def _parse_array_block(self, text: str, start_pos: int) -> Tuple[int, int, List[str], str]:
+        """Given file text and the offset just past an array's `NAME=(`, return:
+        - body start and end offsets: text[body_start:body_end] is the array body
+          (body_start == start_pos for a single-line array)
         - list of entries as raw lines (preserve comments on those lines)
         - indentation (leading whitespace) used for entries
         """
-        entries: List[str] = []
-        indent = ""
+        line_end = text.find("\n", start_pos)
+        if line_end == -1:
+            line_end = len(text)
 
         # Handle single-line forms like NAME=() or NAME=(a b "c d") or
         # NAME=("${new_array[@]}") by detecting a closing paren on the same
         # line as the opening. In such cases we parse the inner tokens (if any)
         # and return immediately without scanning subsequent lines.
-        start_line = lines[start_idx]
-        m_inline = re.search(r"\((.*)\)", start_line)
-        if m_inline:
-            inner = m_inline.group(1).strip()
-            if inner:
-                # find tokens: quoted or unquoted
-                token_re = re.compile(r'"[^"]*"|\'[^\']*\'|[^\s]+')
-                tokens = token_re.findall(inner)
-                # preserve raw token text as array entry lines
-                entries = [t for t in (tok.strip() for tok in tokens) if t]
-            return start_idx, entries, indent
-
-        # Multi-line array: entries start on the following lines until a line
-        # containing only a closing paren is found.
-        i = start_idx + 1
-        while i < len(lines):
-            line = lines[i]
-            if re.match(r"^\s*\)", line):
-                return i, entries, indent
-            # capture indentation from first non-empty line
-            if indent == "":
-                m = re.match(r"^(\s*)", line)
-                indent = m.group(1) if m else ""
-            entries.append(line.rstrip('\n'))
-            i += 1
-        raise RuntimeError("Array block not closed with )")
+        close = text.rfind(")", start_pos, line_end)
+        if close != -1:
+            # find tokens: quoted or unquoted; raw token text is kept as the
+            # array entry lines
+            entries: List[str] = _TOKEN_RE.findall(text, start_pos, close)
+            return start_pos, close, entries, ""
+
+        # Multi-line array: entries are the lines up to the first line starting
+        # with a closing paren, located with a single regex search.
+        m = self._BLOCK_CLOSE_RE.search(text, line_end + 1)
+        if m is None:
+            raise RuntimeError("Array block not closed with )")
+        body_start, body_end = line_end + 1, m.start()
+        entries = text[body_start:body_end].split("\n")[:-1]
+        # capture indentation from the first indented line
+        indent = ""
+        for line in entries:
+            indent = line[:len(line) - len(line.lstrip())]
+            if indent:
+                break
+        return body_start, body_end, entries, indent
 
     @staticmethod
+    @functools.lru_cache(maxsize=4096)
     def _normalize_entry(line: str) -> Optional[str]:
         """Return the core token for comparison, or None for comments/empty.
 
-        Strips surrounding quotes and trailing comments.
+        Strips surrounding quotes and trailing comments. Memoized: the same
+        entry, comment and blank lines recur across arrays and scripts.
         """
         s = line.strip()
-        if not s:
+        if not s or s[0] == '#':
             return None
-        if s.lstrip().startswith('#'):
-            return None
-        # remove trailing inline comment
-        s = re.sub(r"\s+#.*$", "", s)
+        # remove trailing inline comment: the first '#' preceded by whitespace
+        pos = s.find('#')
+        while pos != -1:
+            if s[pos - 1].isspace():
+                s = s[:pos].rstrip()
+                break
+            pos = s.find('#', pos + 1)
         # remove trailing backslash continuation markers
         s = s.rstrip(' \\')
-        # strip quotes
-        if (s.startswith('"') and s.endswith('"')) or (s.startswith("'") and s.endswith("'")):
+        # strip quotes; like startswith/endswith, a lone quote counts as both
+        # ends and strips to "" (not counted as an entry)
+        if s[:1] in ('"', "'") and s.endswith(s[0]):
             s = s[1:-1]
         return s.strip()
 
     def _write_atomic(self, path: Path, content: str, backup: bool = True) -> None:
-        tmp = Path(tempfile.mktemp(dir=str(path.parent)))
-        tmp.write_text(content, encoding="utf-8")
-        # preserve mode
+        # One stat of the destination serves both mode preservation and the
+        # backup existence check.
         try:
-            st = path.stat()
-            os.chmod(tmp, st.st_mode)
-        except Exception:
-            # ignore
-            pass
-        # Optionally write a backup copy into self.backup_dir if configured.
-        if self.backup_dir and path.exists():
+            st = os.stat(path)
+        except FileNotFoundError:
+            st = None
+        # A fresh random name per attempt, created with O_EXCL (as mkstemp
+        # does), so a temp file left behind by a killed run never blocks later
+        # writes; the ".tmp" suffix is covered by .gitignore. Unlike mkstemp's
+        # fixed 0600, creating with 0o666 lets the kernel apply the umask to a
+        # new file, without touching the process-wide umask.
+        create_mode = 0o666 if st is None else stat.S_IMODE(st.st_mode)
+        while True:
+            tmp = path.parent / f".{path.name}.{os.urandom(6).hex()}.tmp"
             try:
-                self.backup_dir.mkdir(parents=True, exist_ok=True)
-                ts = int(time.time())
-                bak_name = f"{path.name}.{ts}.bak"
-                bak_path = self.backup_dir / bak_name
-                shutil.copy2(path, bak_path)
-                LOG.info("Wrote backup %s", bak_path)
-            except Exception:
-                LOG.exception("Failed to write backup to %s", self.backup_dir)
-        os.replace(str(tmp), str(path))
+                fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_EXCL, create_mode)
+                break
+            except FileExistsError:
+                continue
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                if st is not None:
+                    # os.open applies the umask; match the original mode exactly
+                    os.fchmod(f.fileno(), stat.S_IMODE(st.st_mode))
+                f.write(content)
+                f.flush()
+                new_st = os.fstat(f.fileno())
+            # Optionally write a backup copy into self.backup_dir if configured.
+            if backup and self.backup_dir and st is not None:
+                try:
+                    self.backup_dir.mkdir(parents=True, exist_ok=True)
+                    ts = int(time.time())
+                    bak_name = f"{path.name}.{ts}.bak"
+                    bak_path = self.backup_dir / bak_name
+                    try:
+                        # os.replace below gives `path` a new inode, so a hard
+                        # link keeps the pre-edit content without copying it.
+                        os.link(path, bak_path)
+                    except OSError:
+                        # other filesystem, existing backup name, no link support
+                        shutil.copy2(path, bak_path)
+                    LOG.info("Wrote backup %s", bak_path)
+                except Exception:
+                    LOG.exception("Failed to write backup to %s", self.backup_dir)
+            os.replace(tmp, path)
+        except BaseException:
+            tmp.unlink(missing_ok=True)
+            raise
+        if path in self._file_cache:
+            # rename keeps the inode, so the temp file's fstat is the new stat
+            self._cache_text(path, content, new_st)
+
+    def _edit_array_block(self, text: str, start_pos: int, to_remove: Sequence[str], to_add: Sequence[str]) -> Tuple[str, int, int, int]:
+        """Remove then add entries in the array whose `NAME=(` ends at `start_pos`.
+
+        The block is parsed once and the text rebuilt once, so a removal and an
+        addition on the same array cost a single pass. Entries in `to_add` that
+        are already present (after removals) are skipped.
+
+        Returns (new_text, before_count, removed, added); `new_text` is `text`
+        itself when nothing changed.
+        """
+        # Work on offsets into `text`: only the array block itself is split
+        # into lines, the rest of the file is spliced back unchanged.
+        body_start, body_end, current_lines, indent = self._parse_array_block(text, start_pos)
+        inline = body_start == start_pos
+
+        norms = [self._normalize_entry(raw) for raw in current_lines]
+        existing = {n for n in norms if n}
+        before_count = sum(1 for n in norms if n)
 
-    def add_entries_to_array(self, file_path: Path, array_name: str, entries: List[str], write: bool = True) -> ArrayEditResult:
+        # Only filter the block when some entry actually needs removing
+        kept = current_lines
+        removed = 0
+        doomed = existing.intersection(to_remove)
+        if doomed:
+            kept = [raw for raw, n in zip(current_lines, norms) if n not in doomed]
+            removed = len(current_lines) - len(kept)
+            existing -= doomed
+
+        # Append additions before the closing paren, avoiding duplicates with
+        # both the existing entries and earlier additions (set lookups only)
+        additions = []
+        seen_new = set()
+        for ent in to_add:
+            if ent not in existing and ent not in seen_new:
+                seen_new.add(ent)
+                additions.append(ent)
+
+        if not removed and not additions:
+            return text, before_count, 0, 0
+        if inline:
+            new_text = text[:body_start] + " ".join([*kept, *additions]) + text[body_end:]
+        else:
+            # Without removals the existing entries are reused as the original
+            # slice; only the appended lines are formatted.
+            head = text[:body_end] if not removed else text[:body_start] + "".join(f"{line}\n" for line in kept)
+            new_text = head + "".join(f"{indent}{ent}\n" for ent in additions) + text[body_end:]
+        if not new_text.endswith("\n"):
+            new_text += "\n"
+        return new_text, before_count, removed, len(additions)
+
+    def add_entries_to_array(self, file_path: Path, array_name: str, entries: Sequence[str], write: bool = True) -> ArrayEditResult:
         """Add entries to the named array in file_path.
 
         If `write` is False the function performs a dry-run and does not
@@ -347,53 +753,24 @@ class BuildCustomizer:
         Returns ArrayEditResult.
         """
         file_path = Path(file_path)
-        text = file_path.read_text(encoding="utf-8")
-        lines = text.splitlines()
-
-        # find start
-        start_idx = None
-        for idx, line in enumerate(lines):
-            if re.match(rf"^\s*{re.escape(array_name)}\s*=\s*\(", line):
-                start_idx = idx
-                break
-        if start_idx is None:
+        text, parsed = self._read_cached(file_path)
+        start_pos = self._find_array_start(text, parsed, array_name)
+        if start_pos is None:
             raise ValueError(f"Array {array_name} not found in {file_path}")
 
-        end_idx, current_lines, indent = self._parse_array_block(lines, start_idx)
-        current_entries = [self._normalize_entry(l) for l in current_lines]
-        current_entries_clean = [e for e in current_entries if e]
-        before_count = len(current_entries_clean)
-
-        # prepare additions, avoid duplicates
-        additions = []
-        for ent in entries:
-            if ent not in current_entries_clean:
-                additions.append(ent)
-
-        if not additions:
+        new_text, before_count, _, added = self._edit_array_block(text, start_pos, (), entries)
+        if not added:
             LOG.info("No entries to add for %s in %s", array_name, file_path)
             return ArrayEditResult(file_path, changed=False, before_count=before_count, after_count=before_count)
 
-        # Construct new block
-        new_block_lines = list(current_lines)
-        # Append additions before the closing paren
-        for ent in additions:
-            # preserve simple quoting style: use unquoted token if original entries unquoted, else use double quotes
-            new_block_lines.append(f"{indent}{ent}")
-
-        # rebuild file content
-        new_lines = lines[: start_idx + 1] + new_block_lines + lines[end_idx:]
-        new_text = "\n".join(new_lines) + "\n"
-
         if write:
             self._write_atomic(file_path, new_text)
         else:
-            LOG.info("Dry-run: would add %d entries to %s:%s", len(additions), file_path, array_name)
-        after_count = before_count + len(additions)
-        LOG.info("Added %d entries to %s:%s", len(additions), file_path, array_name)
-        return ArrayEditResult(file_path, changed=True, before_count=before_count, after_count=after_count)
+            LOG.info("Dry-run: would add %d entries to %s:%s", added, file_path, array_name)
+        LOG.info("Added %d entries to %s:%s", added, file_path, array_name)
+        return ArrayEditResult(file_path, changed=True, before_count=before_count, after_count=before_count + added)
 
-    def remove_entries_from_array(self, file_path: Path, array_name: str, entries: List[str], write: bool = True) -> ArrayEditResult:
+    def remove_entries_from_array(self, file_path: Path, array_name: str, entries: Sequence[str], write: bool = True) -> ArrayEditResult:
         """Remove entries from the named array in file_path.
 
         If `write` is False the function performs a dry-run and does not
@@ -403,46 +780,76 @@ class BuildCustomizer:
         Returns ArrayEditResult.
         """
         file_path = Path(file_path)
-        text = file_path.read_text(encoding="utf-8")
-        lines = text.splitlines()
-
-        # find start
-        start_idx = None
-        for idx, line in enumerate(lines):
-            if re.match(rf"^\s*{re.escape(array_name)}\s*=\s*\(", line):
-                start_idx = idx
-                break
-        if start_idx is None:
+        text, parsed = self._read_cached(file_path)
+        start_pos = self._find_array_start(text, parsed, array_name)
+        if start_pos is None:
             raise ValueError(f"Array {array_name} not found in {file_path}")
 
-        end_idx, current_lines, indent = self._parse_array_block(lines, start_idx)
-        current_entries = [self._normalize_entry(l) for l in current_lines]
-        current_entries_clean = [e for e in current_entries if e]
-        before_count = len(current_entries_clean)
-
-        to_remove = set(entries)
-        new_block_lines: List[str] = []
-        removed = 0
-        for raw in current_lines:
-            norm = self._normalize_entry(raw)
-            if norm and norm in to_remove:
-                removed += 1
-                continue
-            new_block_lines.append(raw)
-
-        if removed == 0:
+        new_text, before_count, removed, _ = self._edit_array_block(text, start_pos, entries, ())
+        if not removed:
             LOG.info("No matching entries to remove for %s in %s", array_name, file_path)
             return ArrayEditResult(file_path, changed=False, before_count=before_count, after_count=before_count)
 
-        new_lines = lines[: start_idx + 1] + new_block_lines + lines[end_idx:]
-        new_text = "\n".join(new_lines) + "\n"
         if write:
             self._write_atomic(file_path, new_text)
         else:
             LOG.info("Dry-run: would remove %d entries from %s:%s", removed, file_path, array_name)
-        after_count = before_count - removed
         LOG.info("Removed %d entries from %s:%s", removed, file_path, array_name)
-        return ArrayEditResult(file_path, changed=True, before_count=before_count, after_count=after_count)
+        return ArrayEditResult(file_path, changed=True, before_count=before_count, after_count=before_count - removed)
+
+    def _edit_file_arrays(self, fp: Path, array_names: List[str], dry_run: bool) -> Tuple[List[ArrayEditResult], Optional[str]]:
+        """Apply REMOVAL_LIST/ADDITION_LIST to each of `array_names` in `fp`, in memory.
+
+        Returns the per-array results and the new file text, or None when the
+        file is unchanged (or could not be read).
+        """
+        try:
+            st = os.stat(fp)
+            clean = self._clean_entry("defaults", fp, st)
+            if clean is not None and all(name in clean[2] for name in array_names):
+                LOG.info("No changes for %s (unchanged since it was last found up to date)", fp)
+                counts = clean[2]
+                return [ArrayEditResult(fp, changed=False, before_count=counts[name], after_count=counts[name])
+                        for name in array_names], None
+            text, offsets = self._read_cached(fp)
+        except Exception as e:
+            LOG.exception("Error reading %s: %s", fp, e)
+            return [], None
+
+        # All block offsets come from the single finditer pass in _read_cached.
+        # Editing from the last block back to the first keeps them valid, since
+        # splicing a block only shifts the text after it.
+        starts = {name: self._find_array_start(text, offsets, name) for name in array_names}
+        by_name: dict = {}
+        new_text = text
+        for array_name in sorted(array_names, key=lambda n: -1 if starts[n] is None else starts[n], reverse=True):
+            try:
+                start_pos = starts[array_name]
+                if start_pos is None:
+                    raise ValueError(f"Array {array_name} not found in {fp}")
+                edited, before_count, removed, added = self._edit_array_block(
+                    new_text,
+                    start_pos,
+                    self.REMOVAL_LIST.get(array_name, ()),
+                    self.ADDITION_LIST.get(array_name, ()),
+                )
+            except Exception as e:
+                LOG.exception("Error editing entries for %s in %s: %s", array_name, fp, e)
+                continue
+            if edited is not new_text:
+                new_text = edited
+                LOG.info("%sRemoved %d and added %d entries in %s:%s",
+                         "Dry-run: " if dry_run else "", removed, added, fp, array_name)
+            else:
+                LOG.info("No changes for %s in %s", array_name, fp)
+            by_name[array_name] = ArrayEditResult(
+                fp, changed=bool(removed or added),
+                before_count=before_count, after_count=before_count - removed + added,
+            )
+        edits = [by_name[name] for name in array_names if name in by_name]
+        if new_text is text and len(edits) == len(array_names):
+            self._mark_clean("defaults", fp, st, {name: by_name[name].before_count for name in array_names})
+        return edits, (None if new_text is text else new_text)
 
     def apply_defaults(self, patterns: Optional[List[str]] = None, dry_run: bool = True) -> dict:
         """Find files containing the default arrays and apply additions/removals.
@@ -450,34 +857,58 @@ class BuildCustomizer:
         - `patterns` restricts the glob search (defaults to DEFAULT_SEARCH_PATTERNS)
         - `dry_run` when True will not write changes, only report what would happen
 
+        Each file is read once, every default array in it is edited in memory
+        (removals then additions, fused into one pass per array) and the file
+        is written at most once.
+
         Returns a mapping: { Path(str): [ArrayEditResult, ...], ... }
         """
         patterns = patterns or self.DEFAULT_SEARCH_PATTERNS
         mapping = self.find_files_for_default_arrays(patterns=patterns)
         results: dict = {}
 
-        # For each array name, process its list of files
+        # Group the array names by file so each file is handled in one go
+        file_arrays: Dict[Path, List[str]] = defaultdict(list)
         for array_name, files in mapping.items():
             for fp in files:
-                results.setdefault(str(fp), [])
-                # removals first (if any)
-                if array_name in self.REMOVAL_LIST:
-                    try:
-                        res = self.remove_entries_from_array(fp, array_name, list(self.REMOVAL_LIST[array_name]), write=not dry_run)
-                        results[str(fp)].append(res)
-                    except Exception as e:
-                        LOG.exception("Error removing entries for %s in %s: %s", array_name, fp, e)
-                # additions next (if any)
-                if array_name in self.ADDITION_LIST:
-                    try:
-                        res = self.add_entries_to_array(fp, array_name, list(self.ADDITION_LIST[array_name]), write=not dry_run)
-                        results[str(fp)].append(res)
-                    except Exception as e:
-                        LOG.exception("Error adding entries for %s in %s: %s", array_name, fp, e)
+                file_arrays[fp].append(array_name)
+
+        # Files are independent: read and edit them concurrently, then write
+        # the results one at a time from this thread.
+        jobs = list(file_arrays.items())
+        with ThreadPoolExecutor(max_workers=min(self.MAX_WORKERS, len(jobs) or 1)) as ex:
+            outcomes = list(ex.map(lambda job: self._edit_file_arrays(job[0], job[1], dry_run), jobs))
+
+        for (fp, _), (edits, new_text) in zip(jobs, outcomes):
+            results[str(fp)] = edits
+            if new_text is not None and not dry_run:
+                self._write_atomic(fp, new_text)
 
         LOG.info("apply_defaults completed (dry_run=%s). Processed %d files.", dry_run, len(results))
         return results
 
+    def _probe_dnf_file(self, file_path: Path) -> Optional[str]:
+        """Return the text of `file_path` if it may hold a dnf install with
+        FEDORA_PACKAGES, else None (and remember the file as clean)."""
+        try:
+            st = os.stat(file_path)
+            if self._clean_entry("dnf", file_path, st) is not None:
+                return None
+            with open(file_path, "rb") as f:
+                raw = f.read()
+            # cheap bytes probe before decoding; most scripts have no dnf install
+            if not all(n in raw for n in self._DNF_NEEDLES):
+                self._mark_clean("dnf", file_path, st)
+                return None
+            text = self._decode_script(raw)
+        except Exception as e:
+            LOG.error("Failed to read file %s: %s", file_path, e)
+            return None
+        if _DNF_INSTALL_RE.search(text):
+            return text
+        self._mark_clean("dnf", file_path, st)
+        return None
+
     def apply_dnf_exclusions(self, patterns: Optional[List[str]] = None, dry_run: bool = True) -> dict:
         """Apply DNF install exclusions to all script files with FEDORA_PACKAGES context.
 
@@ -499,24 +930,23 @@ class BuildCustomizer:
             LOG.warning("No weak packages defined in REMOVAL_LIST")
             return results
         
-        # Find all files with DNF install commands
-        files_with_dnf = set()
-        for pattern in patterns:
-            for file_path in self.repo_root.glob(pattern):
-                if not file_path.is_file():
-                    continue
-                matches = self.find_dnf_install_commands(file_path)
-                if matches:
-                    files_with_dnf.add(file_path)
+        # Find all files with DNF install commands; each file is read once and
+        # its text handed on, so add_exclusions_to_dnf_install does not re-read it.
+        # The probes are independent and I/O-bound; ex.map keeps walk order.
+        paths = list(dict.fromkeys(Path(p) for p in self._iter_sh_files(patterns)))
+        with ThreadPoolExecutor(max_workers=min(self.MAX_WORKERS, len(paths) or 1)) as ex:
+            texts = list(ex.map(self._probe_dnf_file, paths))
+        files_with_dnf = [(fp, text) for fp, text in zip(paths, texts) if text is not None]
         
         LOG.info("Found %d files with DNF install commands to modify", len(files_with_dnf))
         
         # Apply exclusions to each file using WEAK_PACKAGES_TO_EXCLUDE
-        for file_path in files_with_dnf:
+        for file_path, text in files_with_dnf:
             modified_count, message = self.add_exclusions_to_dnf_install(
                 file_path,
                 exclude_packages=exclude_packages,
-                write=not dry_run
+                write=not dry_run,
+                text=text,
             )
             results[str(file_path)] = (modified_count, message)
             LOG.info("%s: %s", file_path, message)
@@ -588,7 +1018,8 @@ class BuildCustomizer:
                     continue
                 if to_insert:
                     # match indentation of anchor line
-                    indent = re.match(r"^(\s*)", lines[idx]).group(1)
+                    anchor_line = lines[idx]
+                    indent = anchor_line[:len(anchor_line) - len(anchor_line.lstrip())]
                     insert_lines = [f"{indent}{e}" for e in to_insert]
                     lines[idx + 1:idx + 1] = insert_lines
                     added += len(to_insert)
@@ -626,10 +1057,17 @@ class BuildCustomizer:
                 continue
             dest.parent.mkdir(parents=True, exist_ok=True)
             content = src.read_bytes()
-            tmp = Path(tempfile.mktemp(dir=str(dest.parent)))
-            tmp.write_bytes(content)
-            os.chmod(tmp, 0o755)
-            os.replace(str(tmp), str(dest))
+            # mkstemp creates the temp file itself (O_EXCL), unlike mktemp,
+            # so no other process can claim the name between choosing and opening it.
+            fd, tmp = tempfile.mkstemp(dir=str(dest.parent), prefix=f".{dest.name}.", suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    os.fchmod(f.fileno(), 0o755)
+                    f.write(content)
+                os.replace(tmp, str(dest))
+            except BaseException:
+                os.unlink(tmp)
+                raise
             LOG.info("Copied %s -> %s (+x)", src, dest)
             results[str(dest)] = "copied"
         return results
@@ -649,12 +1087,8 @@ class BuildCustomizer:
         lines = text.splitlines()
         matches: List[Tuple[int, str]] = []
         
-        # Pattern to match: dnf install with FEDORA_PACKAGES context
-        # Matches: dnf -y install ... FEDORA_PACKAGES ... or variations
-        dnf_pattern = re.compile(r'dnf\s+(?:-y\s+)?install.*FEDORA_PACKAGES')
-        
         for idx, line in enumerate(lines):
-            if dnf_pattern.search(line):
+            if _DNF_INSTALL_RE.search(line):
                 matches.append((idx, line))
         
         LOG.info("Found %d DNF install commands with FEDORA_PACKAGES in %s", len(matches), file_path)
@@ -676,7 +1110,13 @@ class BuildCustomizer:
         """
         return list(self.REMOVAL_LIST.get("WEAK_PACKAGES_TO_EXCLUDE", []))
 
-    def add_exclusions_to_dnf_install(self, file_path: Path, exclude_packages: Optional[List[str]] = None, write: bool = True) -> Tuple[int, str]:
+    def add_exclusions_to_dnf_install(
+        self,
+        file_path: Path,
+        exclude_packages: Optional[List[str]] = None,
+        write: bool = True,
+        text: Optional[str] = None,
+    ) -> Tuple[int, str]:
         """Modify DNF install commands in a file to add --exclude flags.
 
         For each line containing 'dnf -y install ${FEDORA_PACKAGES[@]}' or similar patterns,
@@ -686,6 +1126,7 @@ class BuildCustomizer:
             file_path: Path to the bash script to modify
             exclude_packages: List of package names to exclude. If None, uses UNWANTED_PACKAGES
             write: If True, write changes to file; else perform dry-run
+            text: Already-read contents of file_path; read from disk if None
 
         Returns:
             Tuple of (modified_count: int, result_message: str)
@@ -700,43 +1141,30 @@ class BuildCustomizer:
             LOG.warning("No packages to exclude provided")
             return 0, "No packages to exclude"
         
-        try:
-            text = file_path.read_text(encoding="utf-8")
-        except Exception as e:
-            return 0, f"Failed to read file: {e}"
-        
-        lines = text.splitlines()
-        modified_count = 0
-        
-        # Pattern to match dnf install commands with FEDORA_PACKAGES context
-        # Matches: dnf -y install ... FEDORA_PACKAGES ...
-        dnf_pattern = re.compile(r'^(\s*)(dnf\s+(?:-y\s+)?install.*FEDORA_PACKAGES.*)$')
+        if text is None:
+            try:
+                text = file_path.read_text(encoding="utf-8")
+            except Exception as e:
+                return 0, f"Failed to read file: {e}"
         
-        for idx, line in enumerate(lines):
-            match = dnf_pattern.match(line)
-            if match:
-                indent = match.group(1)
-                dnf_full_cmd = match.group(2)
-                
-                # Build exclude flags
-                exclude_flags = " ".join([f"--exclude={pkg}" for pkg in exclude_packages])
-                
-                # Insert exclusions after 'install' keyword
-                # Replace 'install' with 'install --exclude=pkg1 --exclude=pkg2'
-                new_full_cmd = dnf_full_cmd.replace('install', f'install {exclude_flags}', 1)
-                new_line = f"{indent}{new_full_cmd}"
-                
-                LOG.info("Modified line %d: %s", idx + 1, line)
-                LOG.info("          to: %s", new_line)
-                
-                lines[idx] = new_line
-                modified_count += 1
+        # Build exclude flags
+        exclude_flags = " ".join([f"--exclude={pkg}" for pkg in exclude_packages])
+
+        def _insert_flags(match: re.Match) -> str:
+            # Insert exclusions after the 'install' keyword:
+            # 'install' -> 'install --exclude=pkg1 --exclude=pkg2'
+            indent, dnf_install, rest = match.groups()
+            new_line = f"{indent}{dnf_install} {exclude_flags}{rest}"
+            LOG.info("Modified line %d: %s", text.count("\n", 0, match.start()) + 1, match.group(0))
+            LOG.info("          to: %s", new_line)
+            return new_line
+
+        # One substitution over the whole text; unmatched lines are never split out.
+        new_text, modified_count = _DNF_INSTALL_LINE_RE.subn(_insert_flags, text)
         
         if modified_count == 0:
             return 0, "No DNF install commands found to modify"
         
-        # Rebuild content
-        new_text = "\n".join(lines)
         if not new_text.endswith("\n"):
             new_text += "\n"
         
@@ -765,7 +1193,7 @@ def _cli():
     p.add_argument(
         "--write",
         action="store_true",
-        help="If set with --apply-defaults, write changes to files. Otherwise perform a dry-run.",
+        help="If set with --apply-defaults, write changes to files (and persist the file cache). Otherwise perform a dry-run.",
     )
     p.add_argument(
         "--patterns",
@@ -787,11 +1215,47 @@ def _cli():
         action="store_true",
         help="Skip line-level modifications defined in LINE_MODS",
     )
+    p.add_argument(
+        "--cache-file",
+        help=f"File cache used to skip re-reading unchanged scripts; only written with --write (defaults to <repo_root>/{BuildCustomizer.DEFAULT_CACHE_FILE})",
+        default=None,
+    )
+    p.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Do not load or persist the file cache",
+    )
+    p.add_argument(
+        "--profile",
+        action="store_true",
+        help="Run under cProfile and print the top functions by cumulative time to stderr",
+    )
 
     args = p.parse_args()
 
     bc = BuildCustomizer(repo_root=args.repo_root, backup_dir=args.backup_dir)
 
+    cache_path = None
+    if not args.no_cache:
+        cache_path = Path(args.cache_file) if args.cache_file else bc.repo_root / bc.DEFAULT_CACHE_FILE
+        bc.load_file_cache(cache_path)
+    try:
+        if args.profile:
+            import cProfile
+            import pstats
+
+            profiler = cProfile.Profile()
+            profiler.runcall(_run, bc, args)
+            pstats.Stats(profiler, stream=sys.stderr).sort_stats("cumulative").print_stats(25)
+        else:
+            _run(bc, args)
+    finally:
+        # A dry run must leave the tree untouched, cache file included.
+        if cache_path is not None and args.write:
+            bc.save_file_cache(cache_path)
+
+
+def _run(bc: BuildCustomizer, args: argparse.Namespace) -> None:
     # Apply DNF exclusions by default (unless skipped)
     if not args.skip_dnf_exclusions:
         patterns = None